@@ -2,16 +2,21 @@
 """Stemmogram: audio visualization via stem separation and spectrograms."""
 
 import argparse
+import functools
+import hashlib
 import json
 import os
 import re
 import subprocess
 import sys
 import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
 import numpy as np
-from PIL import Image, ImageDraw, ImageFont, ImageOps
+from PIL import Image, ImageDraw, ImageFont
 
 STEMS = ["vocals", "other", "bass", "drums"]
 COLOR_PALETTES = {
@@ -61,90 +66,90 @@ def parse_args():
     return parser.parse_args()
 
 
-def extract_metadata(input_path: str) -> dict:
-    """Extract duration, bitrate via ffprobe and loudness via ffmpeg ebur128."""
-    # Duration, bitrate, and sample rate
+def run_ffprobe(input_path: str) -> dict:
+    """Probe just the fields we use (duration, bitrate, sample rate) as JSON."""
     result = subprocess.run(
         [
             "ffprobe",
             "-v", "quiet",
             "-print_format", "json",
-            "-show_format",
-            "-show_streams",
+            "-select_streams", "a:0",
+            "-show_entries", "format=duration,bit_rate:stream=sample_rate",
             input_path,
         ],
         capture_output=True,
         text=True,
         check=True,
     )
-    info = json.loads(result.stdout)
+    return json.loads(result.stdout)
+
+
+def run_loudness_scan(input_path: str) -> bytes:
+    """Run ebur128 + volumedetect in a single ffmpeg decode and return its stderr."""
+    result = subprocess.run(
+        [
+            "ffmpeg",
+            "-i", input_path,
+            # framelog=verbose keeps ebur128's per-frame lines out of stderr
+            # at the default loglevel; only the summary block remains, which
+            # is all the regexes below should ever see
+            "-af", "ebur128=framelog=verbose,volumedetect",
+            "-f", "null",
+            "-",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    return result.stderr
+
+
+def extract_metadata(input_path: str) -> dict:
+    """Extract duration, bitrate via ffprobe and loudness via ffmpeg ebur128."""
+    # ffprobe is trivial next to the full decode, so overlap the two calls
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        probe_future = executor.submit(run_ffprobe, input_path)
+        try:
+            loudness_stderr = executor.submit(run_loudness_scan, input_path).result()
+        except Exception:
+            loudness_stderr = b""
+        info = probe_future.result()
+
     fmt = info.get("format", {})
     duration_s = float(fmt.get("duration", 0))
     bitrate_bps = int(fmt.get("bit_rate", 0))
 
-    # Sample rate from first audio stream
+    # Sample rate from the selected audio stream
     sample_rate = "N/A"
-    for stream in info.get("streams", []):
-        if stream.get("codec_type") == "audio":
-            sr = stream.get("sample_rate")
-            if sr:
-                sample_rate = f"{int(sr) // 1000}kHz" if int(sr) >= 1000 else f"{sr}Hz"
-            break
+    streams = info.get("streams", [])
+    if streams:
+        sr = streams[0].get("sample_rate")
+        if sr:
+            sample_rate = f"{int(sr) // 1000}kHz" if int(sr) >= 1000 else f"{sr}Hz"
 
     minutes = int(duration_s // 60)
     seconds = int(duration_s % 60)
     duration_str = f"{minutes}:{seconds:02d}"
     bitrate_kbps = bitrate_bps // 1000
 
-    # Integrated loudness (LUFS) and loudness range (LRA) via ebur128
+    # Integrated loudness (LUFS), loudness range (LRA), and volume stats,
+    # all parsed from the single merged scan. The regexes run on raw bytes
+    # so the stderr log is never decoded wholesale.
     lufs_value = None
     lra_value = None
-    try:
-        result = subprocess.run(
-            [
-                "ffmpeg",
-                "-i", input_path,
-                "-af", "ebur128=framelog=verbose",
-                "-f", "null",
-                "-",
-            ],
-            capture_output=True,
-            text=True,
-        )
-        stderr = result.stderr
-        match = re.search(r"I:\s+([-\d.]+)\s+LUFS", stderr)
-        if match:
-            lufs_value = float(match.group(1))
-        match_lra = re.search(r"LRA:\s+([-\d.]+)\s+LU", stderr)
-        if match_lra:
-            lra_value = float(match_lra.group(1))
-    except Exception:
-        pass
-
-    # Mean and max volume via volumedetect
     mean_volume = "N/A"
     max_volume = "N/A"
-    try:
-        result = subprocess.run(
-            [
-                "ffmpeg",
-                "-i", input_path,
-                "-af", "volumedetect",
-                "-f", "null",
-                "-",
-            ],
-            capture_output=True,
-            text=True,
-        )
-        stderr = result.stderr
-        match_mean = re.search(r"mean_volume:\s+([-\d.]+)\s+dB", stderr)
-        match_max = re.search(r"max_volume:\s+([-\d.]+)\s+dB", stderr)
-        if match_mean:
-            mean_volume = f"{float(match_mean.group(1)):.1f} dB"
-        if match_max:
-            max_volume = f"{float(match_max.group(1)):.1f} dB"
-    except Exception:
-        pass
+    match = re.search(rb"I:\s+([-\d.]+)\s+LUFS", loudness_stderr)
+    if match:
+        lufs_value = float(match.group(1))
+    match_lra = re.search(rb"LRA:\s+([-\d.]+)\s+LU", loudness_stderr)
+    if match_lra:
+        lra_value = float(match_lra.group(1))
+    match_mean = re.search(rb"mean_volume:\s+([-\d.]+)\s+dB", loudness_stderr)
+    match_max = re.search(rb"max_volume:\s+([-\d.]+)\s+dB", loudness_stderr)
+    if match_mean:
+        mean_volume = f"{float(match_mean.group(1)):.1f} dB"
+    if match_max:
+        max_volume = f"{float(match_max.group(1)):.1f} dB"
 
     return {
         "duration": duration_str,
@@ -165,14 +170,14 @@ def measure_stem_loudness(wav_path: str) -> dict:
     try:
         result = subprocess.run(
             ["ffmpeg", "-i", wav_path, "-af", "ebur128=framelog=verbose", "-f", "null", "-"],
-            capture_output=True,
-            text=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
         )
         stderr = result.stderr
-        match = re.search(r"I:\s+([-\d.]+)\s+LUFS", stderr)
+        match = re.search(rb"I:\s+([-\d.]+)\s+LUFS", stderr)
         if match:
             lufs_value = float(match.group(1))
-        match_lra = re.search(r"LRA:\s+([-\d.]+)\s+LU", stderr)
+        match_lra = re.search(rb"LRA:\s+([-\d.]+)\s+LU", stderr)
         if match_lra:
             lra_value = float(match_lra.group(1))
     except Exception:
@@ -180,131 +185,421 @@ def measure_stem_loudness(wav_path: str) -> dict:
     return {"lufs": lufs_value, "lra": lra_value}
 
 
+_demucs_model = None
+_demucs_lock = threading.Lock()
+
+
+def get_demucs_model():
+    """Load and cache the htdemucs model once per process."""
+    global _demucs_model
+    with _demucs_lock:
+        if _demucs_model is None:
+            from demucs.pretrained import get_model
+            _demucs_model = get_model("htdemucs")
+            _demucs_model.eval()
+    return _demucs_model
+
+
+def apply_model_batched(model, mix, device: str, overlap: float = 0.25, batch_size: int = 8):
+    """Run the model over all split segments in batched forward passes.
+
+    apply_model processes segments one at a time; stacking them into batches
+    keeps the GPU (or all CPU cores) saturated. Outputs are overlap-added
+    back with a triangular weight window. Returns (sources, channels, length).
+    """
+    import torch
+    import torch.nn.functional as F
+
+    # get_model returns a BagOfModels wrapper whose forward refuses to run
+    # and which carries no segment length; htdemucs bags exactly one inner
+    # model, so unwrap it. Defer larger bags to demucs' own apply_model.
+    if hasattr(model, "models"):
+        if len(model.models) != 1:
+            from demucs.apply import apply_model
+            return apply_model(model, mix[None], device=device, split=True, overlap=overlap)[0]
+        model = model.models[0]
+
+    length = mix.shape[-1]
+    segment = int(model.samplerate * model.segment)
+    stride = int((1 - overlap) * segment)
+    offsets = list(range(0, length, stride))
+
+    chunks = []
+    for start in offsets:
+        chunk = mix[..., start:start + segment]
+        pad = segment - chunk.shape[-1]
+        if pad > 0:
+            chunk = F.pad(chunk, (0, pad))
+        chunks.append(chunk)
+    batch = torch.stack(chunks)
+
+    # Triangular window so overlapping segments cross-fade
+    weight = torch.cat([
+        torch.arange(1, segment // 2 + 1),
+        torch.arange(segment - segment // 2, 0, -1),
+    ]).to(mix.dtype)
+    weight = weight / weight.max()
+
+    out = torch.zeros(len(model.sources), mix.shape[0], length, dtype=mix.dtype)
+    sum_weight = torch.zeros(length, dtype=mix.dtype)
+    model.to(device)
+    with torch.no_grad():
+        for i in range(0, len(batch), batch_size):
+            sub = batch[i:i + batch_size].to(device)
+            if device == "cuda":
+                with torch.autocast("cuda"):
+                    res = model(sub)
+            else:
+                res = model(sub)
+            res = res.float().cpu()
+            for j, start in enumerate(offsets[i:i + batch_size]):
+                chunk_len = min(segment, length - start)
+                out[..., start:start + chunk_len] += weight[:chunk_len] * res[j][..., :chunk_len]
+                sum_weight[start:start + chunk_len] += weight[:chunk_len]
+    out /= sum_weight
+    return out
+
+
+CACHE_MAX_ENTRIES = 20
+
+
+def content_cache_key(input_path: str) -> str:
+    """Derive a cache key from file size plus the first and last megabyte."""
+    h = hashlib.blake2b(digest_size=16)
+    size = os.path.getsize(input_path)
+    h.update(str(size).encode())
+    chunk = 1024 * 1024
+    with open(input_path, "rb") as f:
+        h.update(f.read(chunk))
+        if size > 2 * chunk:
+            f.seek(-chunk, os.SEEK_END)
+            h.update(f.read(chunk))
+    return h.hexdigest()
+
+
+def touch_cache_entry(cache_dir: str, cache_id: str) -> None:
+    """Mark cache_id as most recently used and evict the oldest entries."""
+    import shutil
+    index_path = os.path.join(cache_dir, "index.json")
+    try:
+        with open(index_path, "r") as f:
+            index = json.load(f)
+    except Exception:
+        index = {}
+    index[cache_id] = time.time()
+    while len(index) > CACHE_MAX_ENTRIES:
+        oldest = min(index, key=index.get)
+        del index[oldest]
+        shutil.rmtree(os.path.join(cache_dir, oldest), ignore_errors=True)
+    try:
+        with open(index_path, "w") as f:
+            json.dump(index, f)
+    except OSError:
+        pass
+
+
 def separate_stems(input_path: str, tmp_dir: str, cache_id: str = None) -> dict:
-    """Run demucs htdemucs to separate audio into stems. Returns dict of stem name -> wav path."""
+    """Run demucs htdemucs to separate audio into stems. Returns dict of stem name -> audio path."""
     cache_dir = "/cache"
 
     # Check if cached stems exist
     if cache_id:
         cached_stem_dir = os.path.join(cache_dir, cache_id)
-        cached_paths = {stem: os.path.join(cached_stem_dir, f"{stem}.wav") for stem in STEMS}
+        cached_paths = {stem: os.path.join(cached_stem_dir, f"{stem}.flac") for stem in STEMS}
         if all(os.path.isfile(p) for p in cached_paths.values()):
             print(f"  Using cached stems from: {cached_stem_dir}")
+            touch_cache_entry(cache_dir, cache_id)
             return cached_paths
 
-    # Run demucs separation
-    sep_dir = os.path.join(tmp_dir, "separated")
-    subprocess.run(
-        [
-            "python3", "-m", "demucs",
-            "-n", "htdemucs",
-            "--out", sep_dir,
-            input_path,
-        ],
-        check=True,
-    )
+    # Separate in-process: reuses the cached model instead of paying the
+    # full model load in a fresh `python3 -m demucs` interpreter
+    import torch
+    from demucs.audio import AudioFile, save_audio
 
-    # demucs outputs to <sep_dir>/htdemucs/<track_name>/<stem>.wav
-    track_name = Path(input_path).stem
-    stem_dir = os.path.join(sep_dir, "htdemucs", track_name)
+    if torch.cuda.is_available():
+        device = "cuda"
+    else:
+        device = "cpu"
+        torch.set_num_threads(os.cpu_count() or 4)
+
+    model = get_demucs_model()
+    wav = AudioFile(input_path).read(
+        streams=0, samplerate=model.samplerate, channels=model.audio_channels
+    )
+    # Same normalization as the demucs CLI (epsilon guards silent input)
+    ref = wav.mean(0)
+    wav = (wav - ref.mean()) / (ref.std() + 1e-8)
+    sources = apply_model_batched(model, wav, device, overlap=0.25)
+    sources = sources * ref.std() + ref.mean()
+
+    # Encode straight into the cache directory when caching: writing to
+    # tmp_dir first only to copy each stem over again doubles disk writes
+    if cache_id:
+        stem_dir = os.path.join(cache_dir, cache_id)
+    else:
+        stem_dir = os.path.join(tmp_dir, "separated")
+    os.makedirs(stem_dir, exist_ok=True)
+    separated = {}
+    for name, source in zip(model.sources, sources):
+        # FLAC halves disk writes vs raw WAV; soundfile and ffmpeg both
+        # decode it natively downstream
+        stem_path = os.path.join(stem_dir, f"{name}.flac")
+        save_audio(source.cpu(), stem_path, samplerate=model.samplerate)
+        separated[name] = stem_path
 
     stem_paths = {}
     for stem in STEMS:
-        wav_path = os.path.join(stem_dir, f"{stem}.wav")
-        if not os.path.isfile(wav_path):
-            print(f"ERROR: Expected stem file not found: {wav_path}", file=sys.stderr)
+        if stem not in separated:
+            print(f"ERROR: Expected stem not produced by demucs: {stem}", file=sys.stderr)
             sys.exit(1)
-        stem_paths[stem] = wav_path
+        stem_paths[stem] = separated[stem]
 
-    # Save to cache if cache_id provided
     if cache_id:
-        import shutil
-        cached_stem_dir = os.path.join(cache_dir, cache_id)
-        os.makedirs(cached_stem_dir, exist_ok=True)
-        for stem, src_path in stem_paths.items():
-            dst_path = os.path.join(cached_stem_dir, f"{stem}.wav")
-            shutil.copy2(src_path, dst_path)
-            stem_paths[stem] = dst_path
-        print(f"  Cached stems to: {cached_stem_dir}")
+        touch_cache_entry(cache_dir, cache_id)
+        print(f"  Cached stems to: {stem_dir}")
 
     return stem_paths
 
 
-def generate_spectrogram(wav_path: str, output_png: str, height: int = SPEC_HEIGHT, scale: str = "log"):
-    """Generate a spectrogram PNG using ffmpeg showspectrumpic."""
-    subprocess.run(
+def tint_filter_chain(color: tuple) -> str:
+    """Build an ffmpeg filter chain applying the same invert + tint mapping as the LUT."""
+    r, g, b = color
+    return (
+        "format=gray,negate,format=rgb24,"
+        f"lutrgb=r='{r}+val*(255-{r})/255':g='{g}+val*(255-{g})/255':b='{b}+val*(255-{b})/255'"
+    )
+
+
+def load_stem_audio(wav_path: str) -> tuple:
+    """Decode a stem WAV once; returns (raw f32le bytes, sample rate, channels)."""
+    import soundfile as sf
+
+    data, sr = sf.read(wav_path, dtype="float32")
+    channels = data.shape[1] if data.ndim > 1 else 1
+    return data.tobytes(), sr, channels
+
+
+def run_ffmpeg_to_image(audio: tuple, lavfi: str, height: int) -> Image.Image:
+    """Feed raw PCM through an ffmpeg filter graph and read raw RGB from stdout."""
+    raw, sr, channels = audio
+    result = subprocess.run(
         [
             "ffmpeg",
-            "-y",
-            "-i", wav_path,
-            "-lavfi", f"showspectrumpic=s={WIDTH}x{height}:legend=0:start=18:stop=18000:win_func=hann:scale={scale}:fscale=log",
-            output_png,
+            "-threads", "0",
+            "-filter_threads", "0",
+            "-filter_complex_threads", "0",
+            # The input format is fully specified, so skip stream analysis
+            "-analyzeduration", "0",
+            "-probesize", "32",
+            "-f", "f32le",
+            "-ar", str(sr),
+            "-ac", str(channels),
+            "-i", "pipe:0",
+            "-lavfi", lavfi,
+            "-frames:v", "1",
+            # rawvideo skips the PNG encode in ffmpeg and the decode in PIL;
+            # the frame dimensions are fixed by the filter graph
+            "-f", "rawvideo",
+            "-pix_fmt", "rgb24",
+            "pipe:1",
         ],
+        input=raw,
         capture_output=True,
         check=True,
     )
+    return Image.frombuffer("RGB", (WIDTH, height), result.stdout)
+
+
+@functools.lru_cache(maxsize=None)
+def spectro_filter(height: int, scale: str, color: tuple = None) -> str:
+    """Full showspectrumpic filter graph, built once per (height, scale, color)."""
+    lavfi = f"showspectrumpic=s={WIDTH}x{height}:legend=0:start=18:stop=18000:win_func=hann:scale={scale}:fscale=log"
+    if color is not None:
+        lavfi += "," + tint_filter_chain(color)
+    return lavfi
+
+
+@functools.lru_cache(maxsize=None)
+def wave_filter(height: int, scale: str, color: tuple = None) -> str:
+    """Full showwavespic filter graph, built once per (height, scale, color)."""
+    lavfi = f"showwavespic=s={WIDTH}x{height}:colors=white:scale={scale}"
+    if color is not None:
+        lavfi += "," + tint_filter_chain(color)
+    return lavfi
+
+
+def generate_spectrogram(audio: tuple, height: int = SPEC_HEIGHT, scale: str = "log", color: tuple = None) -> Image.Image:
+    """Generate a spectrogram image using ffmpeg showspectrumpic, optionally tinted in-graph."""
+    return run_ffmpeg_to_image(audio, spectro_filter(height, scale, color), height)
+
+
+def generate_waveform(audio: tuple, height: int = SPEC_HEIGHT, scale: str = "log", color: tuple = None) -> Image.Image:
+    """Generate a waveform image using ffmpeg showwavespic, optionally tinted in-graph."""
+    return run_ffmpeg_to_image(audio, wave_filter(height, scale, color), height)
+
+
+@functools.lru_cache(maxsize=4)
+def mel_analysis_kernels(sr: int, n_fft: int, n_mels: int, fmin: int, fmax: int):
+    """Build (and cache) the mel filter bank and Hann window for one STFT config."""
+    import librosa
+    from scipy.signal import get_window
+
+    fb = librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels, fmin=fmin, fmax=min(fmax, sr // 2))
+    window = get_window("hann", n_fft, fftbins=True).astype(np.float32)
+    return fb, window
 
 
-def generate_waveform(wav_path: str, output_png: str, height: int = SPEC_HEIGHT, scale: str = "log"):
-    """Generate a waveform PNG using ffmpeg showwavespic."""
-    subprocess.run(
+def render_stem_combined(audio: tuple, scale: str, color: tuple) -> tuple:
+    """Render one stem's waveform + spectrogram strip in a single ffmpeg pass.
+
+    The decoded PCM is split three ways in-graph: waveform, spectrogram
+    (stacked with a white gap into one SPEC_HEIGHT strip, both tinted), and
+    an ebur128 branch whose summary is parsed from stderr. One decode and
+    one process instead of three. Returns (strip image, loudness dict).
+    """
+    raw, sr, channels = audio
+    tint = tint_filter_chain(color)
+    graph = (
+        "[0:a]asplit=3[w][s][e];"
+        f"[w]showwavespic=s={WIDTH}x{BOTH_STRIP_HEIGHT}:colors=white:scale={scale},{tint}[wt];"
+        f"[s]showspectrumpic=s={WIDTH}x{BOTH_STRIP_HEIGHT}:legend=0:start=18:stop=18000:win_func=hann:scale={scale}:fscale=log,{tint}[st];"
+        f"color=white:s={WIDTH}x{BOTH_GAP},format=rgb24[gap];"
+        "[wt][gap][st]vstack=inputs=3[out];"
+        "[e]ebur128=framelog=verbose[eo]"
+    )
+    result = subprocess.run(
         [
             "ffmpeg",
-            "-y",
-            "-i", wav_path,
-            "-lavfi", f"showwavespic=s={WIDTH}x{height}:colors=white:scale={scale}",
-            output_png,
+            "-threads", "0",
+            "-filter_threads", "0",
+            "-filter_complex_threads", "0",
+            # The input format is fully specified, so skip stream analysis
+            "-analyzeduration", "0",
+            "-probesize", "32",
+            "-f", "f32le",
+            "-ar", str(sr),
+            "-ac", str(channels),
+            "-i", "pipe:0",
+            "-filter_complex", graph,
+            "-map", "[out]",
+            "-frames:v", "1",
+            "-f", "rawvideo",
+            "-pix_fmt", "rgb24",
+            "pipe:1",
+            "-map", "[eo]",
+            "-f", "null",
+            os.devnull,
         ],
+        input=raw,
         capture_output=True,
         check=True,
     )
+    loudness = {"lufs": None, "lra": None}
+    match = re.search(rb"I:\s+([-\d.]+)\s+LUFS", result.stderr)
+    if match:
+        loudness["lufs"] = float(match.group(1))
+    match_lra = re.search(rb"LRA:\s+([-\d.]+)\s+LU", result.stderr)
+    if match_lra:
+        loudness["lra"] = float(match_lra.group(1))
+    return Image.frombuffer("RGB", (WIDTH, SPEC_HEIGHT), result.stdout), loudness
+
+
+def generate_melspectrogram(wav_path: str, height: int = SPEC_HEIGHT) -> np.ndarray:
+    """Generate a mel spectrogram strip (uint8, loud=255) via a batched scipy STFT."""
+    import librosa
+    import soundfile as sf
+    from scipy.fft import rfft
 
+    n_fft = 2048
 
-def generate_melspectrogram(wav_path: str, output_png: str, height: int = SPEC_HEIGHT):
-    """Generate a mel spectrogram PNG using librosa."""
-    import librosa
+    # soundfile decodes the stem directly, skipping librosa's audioread/
+    # resampling machinery (demucs stems are already at the model rate)
+    y, sr = sf.read(wav_path, dtype="float32")
+    if y.ndim > 1:
+        y = y.mean(axis=1)
 
-    y, sr = librosa.load(wav_path, sr=44100)
-    S = librosa.feature.melspectrogram(
-        y=y, sr=sr, n_mels=128, n_fft=2048, hop_length=512, fmin=20, fmax=20000,
-    )
-    S_dB = librosa.power_to_db(S, ref=np.max)
+    # Hop chosen so the frame count lands near the strip width: columns
+    # beyond WIDTH would only be averaged away by the resize below
+    hop_length = max(1, len(y) // WIDTH)
 
-    # Normalize to 0-255 (S_dB ranges from ~-80 to 0)
-    s_min, s_max = S_dB.min(), S_dB.max()
-    if s_max > s_min:
-        mel_norm = (S_dB - s_min) / (s_max - s_min) * 255
-    else:
-        mel_norm = np.zeros_like(S_dB)
+    fb, window = mel_analysis_kernels(sr, n_fft, 128, 20, 20000)
 
-    # Flip vertically so low frequencies are at the bottom
-    mel_img = np.flipud(mel_norm).astype(np.uint8)
+    # Centered frames like librosa's stft, but as one batched FFT over a
+    # strided view instead of per-frame Python calls
+    y = np.pad(y, n_fft // 2)  # zero padding, matching librosa's stft default
+    frames = np.lib.stride_tricks.sliding_window_view(y, n_fft)[::hop_length]
+    S = np.abs(rfft(frames * window, axis=1)) ** 2
+    S = fb @ S.T
+    S_dB = librosa.power_to_db(S, ref=np.max)
+
+    # Normalize to 0-255 and flip low frequencies to the bottom in one
+    # fused pass: the row-reversed view costs nothing and the scale/cast
+    # streams the array a single time
+    s_min = S_dB.min()
+    s_range = S_dB.max() - s_min
+    scale = 255.0 / s_range if s_range > 0 else 0.0
+    mel_img = ((S_dB[::-1] - s_min) * scale).astype(np.uint8)
 
     img = Image.fromarray(mel_img, mode='L')
-    img = img.resize((WIDTH, height), Image.LANCZOS)
-    img.save(output_png)
+    img = img.resize((WIDTH, height), Image.BILINEAR)
+    return np.asarray(img)
 
 
-def tint_spectrogram(png_path: str, color: tuple, height: int = SPEC_HEIGHT) -> Image.Image:
-    """Load a spectrogram, invert to white background, and tint with the given RGB color."""
-    img = Image.open(png_path).convert("L")  # grayscale
-    img = img.resize((WIDTH, height), Image.LANCZOS)
-    img = ImageOps.invert(img)  # black-on-white: silence=255, loud=0
+@functools.lru_cache(maxsize=16)
+def build_tint_lut(color: tuple) -> np.ndarray:
+    """Build a (256, 3) uint8 LUT mapping 0 (loud) -> stem color, 255 (silence) -> white."""
+    rgb = np.asarray(color, dtype=np.uint16)
+    levels = np.arange(256, dtype=np.uint16)[:, None]
+    return (rgb[None, :] + levels * (255 - rgb)[None, :] // 255).astype(np.uint8)
 
-    # Map: 0 (loud) -> stem color, 255 (silence) -> white
-    r_channel = img.point(lambda p: int(color[0] + p * (255 - color[0]) / 255))
-    g_channel = img.point(lambda p: int(color[1] + p * (255 - color[1]) / 255))
-    b_channel = img.point(lambda p: int(color[2] + p * (255 - color[2]) / 255))
 
-    return Image.merge("RGB", (r_channel, g_channel, b_channel))
+# The color set is fixed at module load, so prewarm the LUT cache
+for _palette in COLOR_PALETTES.values():
+    for _color in _palette.values():
+        build_tint_lut(_color)
 
+# Precomputed mapping for blending black at alpha 64 over any pixel value,
+# used for the time-marker columns
+MARKER_BLEND_LUT = (np.arange(256, dtype=np.uint16) * (255 - 64) // 255).astype(np.uint8)
 
-def combine_stem_strips(wave_img: Image.Image, spec_img: Image.Image) -> Image.Image:
-    """Stack a waveform and spectrogram strip with a gap into a SPEC_HEIGHT-tall image."""
-    combined = Image.new("RGB", (WIDTH, SPEC_HEIGHT), "white")
-    combined.paste(wave_img, (0, 0))
-    combined.paste(spec_img, (0, BOTH_STRIP_HEIGHT + BOTH_GAP))
-    return combined
+FONT_DIR = "/usr/share/fonts/truetype/dejavu"
+
+
+def _load_font(filename: str, size: int):
+    try:
+        return ImageFont.truetype(os.path.join(FONT_DIR, filename), size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+# Load each font face/size exactly once per process
+FONTS = {
+    "bold_16": _load_font("DejaVuSans-Bold.ttf", 16),
+    "bold_20": _load_font("DejaVuSans-Bold.ttf", 20),
+    "bold_28": _load_font("DejaVuSans-Bold.ttf", 28),
+    "regular_14": _load_font("DejaVuSans.ttf", 14),
+    "regular_16": _load_font("DejaVuSans.ttf", 16),
+    "regular_20": _load_font("DejaVuSans.ttf", 20),
+}
+
+
+def tint_array(arr: np.ndarray, color: tuple) -> Image.Image:
+    """Tint a grayscale strip (loud=255) onto a white background with the stem color."""
+    # Index the LUT back-to-front so the invert folds into the lookup, and
+    # let np.take write straight into the one output buffer
+    lut = build_tint_lut(color)[::-1]
+    out = np.empty(arr.shape + (3,), dtype=np.uint8)
+    np.take(lut, arr, axis=0, out=out)
+    return Image.fromarray(out, "RGB")
+
+
+# LUFS color zones with their boundaries, fixed for every meter
+LUFS_ZONES = (
+    (-30, -18, (70, 130, 180)),   # blue - quiet
+    (-18, -14, (50, 180, 50)),    # green - streaming target
+    (-14, -9, (255, 165, 0)),     # orange - loud
+    (-9, 0, (220, 50, 50)),       # red - too loud
+)
 
 
 def create_lufs_range_bar(lufs_value: float, lra_value: float = None, width: int = 240, height: int = 28) -> Image.Image:
@@ -321,26 +616,28 @@ def create_lufs_range_bar(lufs_value: float, lra_value: float = None, width: int
       -14 to -18: green (streaming target)
       < -18  : blue (quiet)
     """
-    img = Image.new("RGBA", (width, height), (255, 255, 255, 0))
-    draw = ImageDraw.Draw(img)
+    # Paint the whole meter into one RGBA buffer with slice assignments
+    # instead of a dozen draw.rectangle/draw.line round-trips through PIL
+    arr = np.zeros((height, width, 4), dtype=np.uint8)
 
-    # Scale parameters
+    # Scale parameters: one precomputed pixels-per-LU factor instead of a
+    # closure invoked for every coordinate
     lufs_min, lufs_max = -30, 0
-    scale_range = lufs_max - lufs_min  # 30
+    px_per_lu = width / (lufs_max - lufs_min)
 
     def lufs_to_x(lufs):
-        return int((lufs - lufs_min) / scale_range * width)
+        return int((lufs - lufs_min) * px_per_lu)
 
-    # Draw background track
+    # Background track
     track_height = 8
     track_y = (height - track_height) // 2
-    draw.rectangle([0, track_y, width - 1, track_y + track_height - 1], fill=(220, 220, 220, 255))
+    arr[track_y:track_y + track_height] = (220, 220, 220, 255)
 
-    # Draw tick marks at -24, -18, -14, -9
+    # Tick marks at -24, -18, -14, -9
     tick_values = [-24, -18, -14, -9]
     for tick in tick_values:
         x = lufs_to_x(tick)
-        draw.line([(x, track_y - 2), (x, track_y + track_height + 1)], fill=(180, 180, 180, 255), width=1)
+        arr[track_y - 2:track_y + track_height + 2, x] = (180, 180, 180, 255)
 
     # Clamp LUFS to range
     lufs_clamped = max(lufs_min, min(lufs_max, lufs_value))
@@ -360,16 +657,8 @@ def create_lufs_range_bar(lufs_value: float, lra_value: float = None, width: int
     bar_left = max(0, lufs_to_x(bar_lufs_left))
     bar_right = min(width - 1, lufs_to_x(bar_lufs_right))
 
-    # Color zones with their LUFS boundaries
-    zones = [
-        (-30, -18, (70, 130, 180)),   # blue - quiet
-        (-18, -14, (50, 180, 50)),    # green - streaming target
-        (-14, -9, (255, 165, 0)),     # orange - loud
-        (-9, 0, (220, 50, 50)),       # red - too loud
-    ]
-
-    # Draw each zone segment that overlaps with the bar
-    for zone_min, zone_max, color in zones:
+    # Paint each zone segment that overlaps with the bar
+    for zone_min, zone_max, color in LUFS_ZONES:
         # Find overlap between bar range and zone range
         overlap_min = max(bar_lufs_left, zone_min)
         overlap_max = min(bar_lufs_right, zone_max)
@@ -378,23 +667,22 @@ def create_lufs_range_bar(lufs_value: float, lra_value: float = None, width: int
             x_left = max(bar_left, lufs_to_x(overlap_min))
             x_right = min(bar_right, lufs_to_x(overlap_max))
             if x_left < x_right:
-                draw.rectangle([x_left, bar_y, x_right, bar_y + bar_height - 1], fill=color + (255,))
+                arr[bar_y:bar_y + bar_height, x_left:x_right + 1] = color + (255,)
 
-    # Draw center marker (LUFS position)
+    # Center marker (LUFS position)
     center_x = lufs_to_x(lufs_clamped)
     marker_width = 3
     marker_left = max(bar_left, center_x - marker_width // 2)
     marker_right = min(bar_right, center_x + marker_width // 2)
-    draw.rectangle([marker_left, bar_y, marker_right, bar_y + bar_height - 1], fill=(255, 255, 255, 200))
+    arr[bar_y:bar_y + bar_height, marker_left:marker_right + 1] = (255, 255, 255, 200)
 
-    # Draw bracket ends
+    # Bracket ends (2px wide verticals at the bar edges)
     bracket_height = 6
-    draw.line([(bar_left, bar_y), (bar_left, bar_y + bracket_height)], fill=(0, 0, 0, 180), width=2)
-    draw.line([(bar_right, bar_y), (bar_right, bar_y + bracket_height)], fill=(0, 0, 0, 180), width=2)
-    draw.line([(bar_left, bar_y + bar_height - 1), (bar_left, bar_y + bar_height - 1 - bracket_height)], fill=(0, 0, 0, 180), width=2)
-    draw.line([(bar_right, bar_y + bar_height - 1), (bar_right, bar_y + bar_height - 1 - bracket_height)], fill=(0, 0, 0, 180), width=2)
+    for x in (bar_left, bar_right):
+        arr[bar_y:bar_y + bracket_height + 1, x:x + 2] = (0, 0, 0, 180)
+        arr[bar_y + bar_height - 1 - bracket_height:bar_y + bar_height, x:x + 2] = (0, 0, 0, 180)
 
-    return img
+    return Image.fromarray(arr, "RGBA")
 
 
 def create_header(filename: str, metadata: dict) -> Image.Image:
@@ -402,15 +690,8 @@ def create_header(filename: str, metadata: dict) -> Image.Image:
     header = Image.new("RGB", (WIDTH, HEADER_HEIGHT), "white")
     draw = ImageDraw.Draw(header)
 
-    # Try to load DejaVu Sans, fall back to default
-    font_size = 28
-    label_size = 20
-    try:
-        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", font_size)
-        label_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", label_size)
-    except OSError:
-        font = ImageFont.load_default()
-        label_font = font
+    font = FONTS["bold_28"]
+    label_font = FONTS["regular_20"]
 
     # Layout: filename on the left, stats on the right
     name = Path(filename).stem
@@ -426,11 +707,7 @@ def create_header(filename: str, metadata: dict) -> Image.Image:
     draw.text((20, 46), stats, fill="gray", font=label_font)
 
     # Project reference in top-right corner
-    ref_size = 14
-    try:
-        ref_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", ref_size)
-    except OSError:
-        ref_font = ImageFont.load_default()
+    ref_font = FONTS["regular_14"]
     ref_text = "pforret/stemmogram"
     ref_bbox = draw.textbbox((0, 0), ref_text, font=ref_font)
     ref_w = ref_bbox[2] - ref_bbox[0]
@@ -449,10 +726,7 @@ def create_header(filename: str, metadata: dict) -> Image.Image:
         # LUFS/LRA text to the left of meter
         lra_str = f", {lra:.0f} LU" if lra is not None else ""
         lufs_text = f"{lufs:.1f} LUFS{lra_str}"
-        try:
-            lufs_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 16)
-        except OSError:
-            lufs_font = label_font
+        lufs_font = FONTS["bold_16"]
         lufs_bbox = draw.textbbox((0, 0), lufs_text, font=lufs_font)
         lufs_w = lufs_bbox[2] - lufs_bbox[0]
         draw.text((meter_x - lufs_w - 10, meter_y + 5), lufs_text, fill="gray", font=lufs_font)
@@ -462,22 +736,22 @@ def create_header(filename: str, metadata: dict) -> Image.Image:
 
 def compose_stemmogram(header: Image.Image, spectrograms: list, duration_s: float, stem_metadata: dict = None) -> Image.Image:
     """Stack header + 4 spectrograms into a 1920x1080 image."""
-    final = Image.new("RGB", (WIDTH, TOTAL_HEIGHT), "white")
-    final.paste(header, (0, 0))
+    # Assemble the canvas as one contiguous NumPy buffer instead of a white
+    # fill plus five paste calls
+    final_arr = np.empty((TOTAL_HEIGHT, WIDTH, 3), dtype=np.uint8)
+    final_arr[:HEADER_HEIGHT] = np.asarray(header.convert("RGB"))
+    for i, spec in enumerate(spectrograms):
+        y = HEADER_HEIGHT + i * SPEC_HEIGHT
+        final_arr[y:y + SPEC_HEIGHT] = np.asarray(spec.convert("RGB"))
+    final = Image.fromarray(final_arr)
 
-    try:
-        label_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 20)
-        stats_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 16)
-        time_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 14)
-    except OSError:
-        label_font = ImageFont.load_default()
-        stats_font = label_font
-        time_font = label_font
+    label_font = FONTS["bold_20"]
+    stats_font = FONTS["regular_16"]
+    time_font = FONTS["regular_14"]
 
     draw = ImageDraw.Draw(final)
-    for i, spec in enumerate(spectrograms):
+    for i in range(len(spectrograms)):
         y = HEADER_HEIGHT + i * SPEC_HEIGHT
-        final.paste(spec, (0, y))
         stem_name = STEMS[i]
 
         # Build label with loudness stats
@@ -489,37 +763,27 @@ def compose_stemmogram(header: Image.Image, spectrograms: list, duration_s: floa
                 lra_str = f", {meta['lra']:.0f} LU" if meta.get("lra") is not None else ""
                 stats_text = f"  {meta['lufs']:.1f} LUFS{lra_str}"
 
-        # White shadow for readability over dark waveforms
-        for dx in (-1, 0, 1):
-            for dy in (-1, 0, 1):
-                if dx or dy:
-                    draw.text((10 + dx, y + 6 + dy), label_text, fill="white", font=label_font)
-        draw.text((10, y + 6), label_text, fill="black", font=label_font)
+        # White outline for readability over dark waveforms
+        draw.text((10, y + 6), label_text, fill="black", font=label_font,
+                  stroke_width=1, stroke_fill="white")
 
         # Stats text after stem name
         if stats_text:
             label_bbox = draw.textbbox((10, y + 6), label_text, font=label_font)
             stats_x = label_bbox[2] + 5
-            for dx in (-1, 0, 1):
-                for dy in (-1, 0, 1):
-                    if dx or dy:
-                        draw.text((stats_x + dx, y + 9 + dy), stats_text, fill="white", font=stats_font)
-            draw.text((stats_x, y + 9), stats_text, fill=(80, 80, 80), font=stats_font)
+            draw.text((stats_x, y + 9), stats_text, fill=(80, 80, 80), font=stats_font,
+                      stroke_width=1, stroke_fill="white")
 
-    # Draw semi-transparent time markers every 30 seconds
+    # Draw semi-transparent time markers every 30 seconds by blending only the
+    # pixels under each marker column, instead of a full-image RGBA composite.
     if duration_s > 0:
-        overlay = Image.new("RGBA", (WIDTH, TOTAL_HEIGHT), (0, 0, 0, 0))
-        overlay_draw = ImageDraw.Draw(overlay)
-        t = 30
-        while t < duration_s:
-            x = int(t / duration_s * WIDTH)
-            overlay_draw.line([(x, HEADER_HEIGHT), (x, TOTAL_HEIGHT)], fill=(0, 0, 0, 64), width=1)
-            minutes = int(t // 60)
-            seconds = int(t % 60)
-            label = f"{minutes}:{seconds:02d}"
-            overlay_draw.text((x - 30, TOTAL_HEIGHT - 18), label, fill=(0, 0, 0, 128), font=time_font)
-            t += 30
-        final = Image.alpha_composite(final.convert("RGBA"), overlay).convert("RGB")
+        ts = np.arange(30, duration_s, 30, dtype=np.int64)
+        xs = (ts / duration_s * WIDTH).astype(np.int64)
+        for t, x in zip(ts.tolist(), xs.tolist()):
+            col = MARKER_BLEND_LUT[np.asarray(final.crop((x, HEADER_HEIGHT, x + 1, TOTAL_HEIGHT)))]
+            final.paste(Image.fromarray(col, "RGB"), (x, HEADER_HEIGHT))
+            label = f"{t // 60}:{t % 60:02d}"
+            draw.text((x - 30, TOTAL_HEIGHT - 18), label, fill=(128, 128, 128), font=time_font)
 
     return final
 
@@ -535,25 +799,48 @@ def main():
 
     os.makedirs(output_dir, exist_ok=True)
 
-    print(f"Processing: {input_path}")
+    # Without an explicit --cache id, key the stem cache by file content so
+    # repeated runs on the same audio still skip the demucs pass
+    cache_id = args.cache
+    if cache_id is None and os.path.isdir("/cache"):
+        cache_id = content_cache_key(input_path)
 
-    # Step 1: Extract metadata
-    print("Extracting metadata...")
-    metadata = extract_metadata(input_path)
-    lufs_str = f"{metadata['lufs']:.1f} LUFS" if metadata['lufs'] is not None else "N/A"
-    lra_str = f", LRA: {metadata['lra']:.1f} LU" if metadata['lra'] is not None else ""
-    print(f"  Duration: {metadata['duration']}, Bitrate: {metadata['bitrate_kbps']} kbps, Loudness: {lufs_str}{lra_str}")
+    print(f"Processing: {input_path}")
 
     with tempfile.TemporaryDirectory() as tmp_dir:
-        # Step 2: Separate stems
+        # Steps 1+2: Metadata extraction only reads the input file, so run it
+        # concurrently with stem separation (the long pole) and build the
+        # header as soon as metadata lands, while demucs is still working.
+        print("Extracting metadata...")
         print("Separating stems with htdemucs...")
-        stem_paths = separate_stems(input_path, tmp_dir, args.cache)
+        with ThreadPoolExecutor(max_workers=2) as pipeline:
+            metadata_future = pipeline.submit(extract_metadata, input_path)
+            stems_future = pipeline.submit(separate_stems, input_path, tmp_dir, cache_id)
+
+            metadata = metadata_future.result()
+            lufs_str = f"{metadata['lufs']:.1f} LUFS" if metadata['lufs'] is not None else "N/A"
+            lra_str = f", LRA: {metadata['lra']:.1f} LU" if metadata['lra'] is not None else ""
+            print(f"  Duration: {metadata['duration']}, Bitrate: {metadata['bitrate_kbps']} kbps, Loudness: {lufs_str}{lra_str}")
+
+            header = create_header(input_path, metadata)
+            stem_paths = stems_future.result()
+
+        visual = args.visual.lower()
+        if visual == "spectro,wave" or visual == "wave,spectro":
+            mode = "both"
+        elif visual == "wave":
+            mode = "waveform"
+        elif visual == "mel":
+            mode = "melspectrogram"
+        else:
+            mode = "spectrogram"
+        palette = COLOR_PALETTES[args.colors]
 
         # Step 2b: Measure loudness for each stem (with caching)
         print("Measuring stem loudness...")
         stem_metadata = {}
         cache_dir = "/cache"
-        metadata_cache_path = os.path.join(cache_dir, args.cache, "stem_metadata.json") if args.cache else None
+        metadata_cache_path = os.path.join(cache_dir, cache_id, "stem_metadata.json") if cache_id else None
 
         # Try to load cached metadata
         if metadata_cache_path and os.path.isfile(metadata_cache_path):
@@ -564,17 +851,81 @@ def main():
             except Exception:
                 stem_metadata = {}
 
-        # Measure any missing stems
+        # Measure any missing stems, all ffmpeg scans in parallel. In "both"
+        # mode the combined render reports loudness from the same decode, so
+        # missing stems are left for it instead of scanned here.
+        missing = [s for s in STEMS if s not in stem_metadata or stem_metadata[s].get("lufs") is None]
+        if missing and mode != "both":
+            with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+                results = executor.map(measure_stem_loudness, [stem_paths[s] for s in missing])
+            stem_metadata.update(zip(missing, results))
+            missing = []
         for stem in STEMS:
-            if stem not in stem_metadata or stem_metadata[stem].get("lufs") is None:
-                stem_metadata[stem] = measure_stem_loudness(stem_paths[stem])
+            if stem in missing:
+                continue
             lufs = stem_metadata[stem].get("lufs")
             lra = stem_metadata[stem].get("lra")
             lufs_str = f"{lufs:.1f} LUFS" if lufs else "N/A"
             lra_str = f", {lra:.1f} LU" if lra else ""
             print(f"  {stem}: {lufs_str}{lra_str}")
 
-        # Save to cache if cache_id provided
+        # Step 3: Generate and tint spectrograms/waveforms
+        tinted = []
+        # Threads are enough for the ffmpeg modes (the subprocess blocks in C
+        # and releases the GIL), but the mel mode is GIL-heavy NumPy/librosa
+        # Python code, so give it real processes. Cap the pool so workers x
+        # ffmpeg filter threads stay within the cores we're allowed to use.
+        try:
+            ncores = len(os.sched_getaffinity(0))
+        except AttributeError:
+            ncores = os.cpu_count() or 8
+        max_workers = max(1, min(len(STEMS), ncores // 2))
+        executor_cls = ProcessPoolExecutor if mode == "melspectrogram" else ThreadPoolExecutor
+        with executor_cls(max_workers=max_workers) as executor:
+            render_futures = {}
+            for stem in STEMS:
+                color = palette[stem]
+                print(f"  Generating {mode}: {stem} -> {color}")
+                if mode == "both":
+                    # One ffmpeg pass per stem: wave + spectro + loudness
+                    audio = load_stem_audio(stem_paths[stem])
+                    render_futures[stem] = (
+                        executor.submit(render_stem_combined, audio, args.scale, color),
+                    )
+                elif mode == "waveform":
+                    render_futures[stem] = (
+                        executor.submit(generate_waveform, load_stem_audio(stem_paths[stem]), SPEC_HEIGHT, args.scale, color),
+                    )
+                elif mode == "melspectrogram":
+                    render_futures[stem] = (
+                        executor.submit(generate_melspectrogram, stem_paths[stem], SPEC_HEIGHT),
+                    )
+                else:
+                    render_futures[stem] = (
+                        executor.submit(generate_spectrogram, load_stem_audio(stem_paths[stem]), SPEC_HEIGHT, args.scale, color),
+                    )
+
+            # ffmpeg modes come out already tinted; only mel still tints in Python.
+            for stem in STEMS:
+                if mode == "both":
+                    strip, loudness = render_futures[stem][0].result()
+                    if stem in missing:
+                        stem_metadata[stem] = loudness
+                        lufs = loudness.get("lufs")
+                        lufs_str = f"{lufs:.1f} LUFS" if lufs else "N/A"
+                        lra = loudness.get("lra")
+                        lra_str = f", {lra:.1f} LU" if lra else ""
+                        print(f"  {stem}: {lufs_str}{lra_str}")
+                    tinted.append(strip.convert("RGB"))
+                elif mode == "melspectrogram":
+                    color = palette[stem]
+                    print(f"  Tinting: {stem} -> {color}")
+                    tinted.append(tint_array(render_futures[stem][0].result(), color))
+                else:
+                    tinted.append(render_futures[stem][0].result().convert("RGB"))
+
+        # Save stem metadata to cache if cache_id provided (after rendering,
+        # since "both" mode only learns loudness during the combined render)
         if metadata_cache_path:
             try:
                 os.makedirs(os.path.dirname(metadata_cache_path), exist_ok=True)
@@ -583,51 +934,7 @@ def main():
             except Exception:
                 pass
 
-        # Step 3: Generate and tint spectrograms/waveforms
-        tinted = []
-        visual = args.visual.lower()
-        if visual == "spectro,wave" or visual == "wave,spectro":
-            mode = "both"
-        elif visual == "wave":
-            mode = "waveform"
-        elif visual == "mel":
-            mode = "melspectrogram"
-        else:
-            mode = "spectrogram"
-        palette = COLOR_PALETTES[args.colors]
-        for stem in STEMS:
-            print(f"  Generating {mode}: {stem}...")
-            color = palette[stem]
-            if mode == "both":
-                wave_png = os.path.join(tmp_dir, f"{stem}_wave.png")
-                spec_png = os.path.join(tmp_dir, f"{stem}_spec.png")
-                generate_waveform(stem_paths[stem], wave_png, BOTH_STRIP_HEIGHT, args.scale)
-                generate_spectrogram(stem_paths[stem], spec_png, BOTH_STRIP_HEIGHT, args.scale)
-                print(f"  Tinting: {stem} -> {color}")
-                wave_img = tint_spectrogram(wave_png, color, BOTH_STRIP_HEIGHT)
-                spec_img = tint_spectrogram(spec_png, color, BOTH_STRIP_HEIGHT)
-                tinted.append(combine_stem_strips(wave_img, spec_img))
-            elif mode == "waveform":
-                png_path = os.path.join(tmp_dir, f"{stem}_wave.png")
-                generate_waveform(stem_paths[stem], png_path, SPEC_HEIGHT, args.scale)
-                print(f"  Tinting: {stem} -> {color}")
-                tinted.append(tint_spectrogram(png_path, color))
-            elif mode == "melspectrogram":
-                png_path = os.path.join(tmp_dir, f"{stem}_mel.png")
-                generate_melspectrogram(stem_paths[stem], png_path)
-                print(f"  Tinting: {stem} -> {color}")
-                tinted.append(tint_spectrogram(png_path, color))
-            else:
-                png_path = os.path.join(tmp_dir, f"{stem}_spec.png")
-                generate_spectrogram(stem_paths[stem], png_path, SPEC_HEIGHT, args.scale)
-                print(f"  Tinting: {stem} -> {color}")
-                tinted.append(tint_spectrogram(png_path, color))
-
-        # Step 4: Create header
-        print("Creating header...")
-        header = create_header(input_path, metadata)
-
-        # Step 5: Compose final image
+        # Step 5: Compose final image (header was built during separation)
         print("Compositing stemmogram...")
         final = compose_stemmogram(header, tinted, metadata["duration_s"], stem_metadata)
 
@@ -646,7 +953,9 @@ def main():
             else:
                 suffix = "_stemmogram"
             output_path = os.path.join(output_dir, f"{basename}{suffix}.png")
-        final.save(output_path)
+        # Low compression is 3-5x faster to encode and only slightly larger,
+        # which is a good trade for these mostly-white images
+        final.save(output_path, format="PNG", compress_level=1, optimize=False)
         print(f"Saved: {output_path}")
 
 